@@ -1,14 +1,227 @@
-from flask import Flask, jsonify, request
+from flask import Flask, request
 from flask_cors import CORS
 from collections import OrderedDict
+import operator
+import os
+import sys
+import threading
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    orjson = None
+    import json
 
 app = Flask(__name__)
-CORS(app)
+# Reject request bodies larger than 1 MiB
+app.config["MAX_CONTENT_LENGTH"] = 1024 * 1024
+
+# The frontend is served from another origin, so CORS is on by default. Set
+# CORS_AT_PROXY=1 when a reverse proxy adds the Access-Control-Allow-* headers
+# and answers OPTIONS preflights itself, to skip flask_cors on every request.
+if os.environ.get("CORS_AT_PROXY") != "1":
+    CORS(app)
+
+# Posts keyed by id. Dicts keep insertion order, so iterating the values
+# yields posts in the order they were created.
+POSTS_BY_ID = {
+    1: {"id": 1, "title": "First post", "content": "This is the first post."},
+    2: {"id": 2, "title": "Second post", "content": "This is the second post."},
+}
+
+# Guards POSTS_BY_ID, _NEXT_ID, the search indexes and the caches below, since
+# requests are served from several threads
+_LOCK = threading.Lock()
+
+# Accepted values for the sort_by query parameter and required POST body fields
+_VALID_SORT_FIELDS = frozenset((None, "id", "title", "content"))
+_REQUIRED_POST_FIELDS = ("title", "content")
+
+# Next id to hand out; ids are assigned monotonically and never reused
+_NEXT_ID = max(POSTS_BY_ID, default=0) + 1
+
+# Incremented on every write. Results computed from an older generation are
+# not stored in the caches, so a slow read cannot cache data a write replaced.
+_GENERATION = 0
+
+# Bounded LRU cache of search results keyed by (title_query, content_query)
+_SEARCH_CACHE = OrderedDict()
+_SEARCH_CACHE_MAX = 128
+
+# Column-wise (posts, lowercased titles, lowercased contents) copy of the posts
+# for search, rebuilt lazily after writes
+_SEARCH_COLUMNS = None
+
+# Inverted indexes from lowercased trigram to the ids of posts containing it
+_TITLE_INDEX = {}
+_CONTENT_INDEX = {}
+
+# Text longer than this is not indexed; the ids of such posts are kept in the
+# sets below and always treated as search candidates instead
+_INDEX_MAX_LEN = 1000
+_TITLE_UNINDEXED = set()
+_CONTENT_UNINDEXED = set()
+
+# Serialized GET /api/posts bodies keyed by (sort_by, reverse), or None when unsorted
+_JSON_CACHE = {}
+
+
+def _dumps(payload):
+    """Serialize a payload to compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def _loads(raw):
+    """Parse JSON bytes, raising ValueError if they are not valid JSON."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _read_json_body():
+    """
+    Parse the request body as a JSON object.
+
+    Returns:
+        tuple: (data, None) on success, or (None, error_response) with a 415
+        error if the Content-Type is not JSON and a 400 error if the body is
+        malformed or not a JSON object.
+    """
+    if not request.is_json:
+        return None, _json_response({"error": "Content-Type must be application/json"}, 415)
+    try:
+        data = _loads(request.get_data(cache=False))
+    except ValueError:
+        return None, _json_response({"error": "Invalid JSON"}, 400)
+    if not isinstance(data, dict):
+        return None, _json_response({"error": "Request body must be a JSON object"}, 400)
+    return data, None
+
+
+def _json_response(payload, status):
+    """
+    Build a JSON response, bypassing jsonify's pure-Python encoding. The
+    payload may also be an already serialized JSON body as bytes.
+    """
+    body = payload if isinstance(payload, bytes) else _dumps(payload)
+    return app.response_class(body, status=status, mimetype="application/json")
+
+
+def _invalidate_caches():
+    """
+    Drop all cached query results after the posts have been modified. The
+    caller must hold _LOCK.
+    """
+    global _SEARCH_COLUMNS, _GENERATION
+    _GENERATION += 1
+    _SEARCH_COLUMNS = None
+    _SEARCH_CACHE.clear()
+    _JSON_CACHE.clear()
+
+
+def _cache_store(cache, key, value, generation):
+    """Store value in cache unless the posts changed since generation was read."""
+    with _LOCK:
+        if generation == _GENERATION:
+            cache[key] = value
+
+
+def _trigrams(text):
+    """Return the set of 3-character substrings of text."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _search_indexes(post):
+    """Return (index, unindexed ids, lowercased text) for each indexed field of the post."""
+    return (
+        (_TITLE_INDEX, _TITLE_UNINDEXED, post["_title_lc"]),
+        (_CONTENT_INDEX, _CONTENT_UNINDEXED, post["_content_lc"]),
+    )
+
+
+def _index_text(post, title, content):
+    """
+    Set the post's title and content, store lowercased copies for searching
+    and (re)index the post in the search indexes.
+    """
+    # Lowercase first so nothing is modified if the values are unusable
+    title_lc = title.lower()
+    content_lc = content.lower()
+    if "_title_lc" in post:
+        _unindex_text(post)
+    post["title"] = title
+    post["content"] = content
+    post["_title_lc"] = title_lc
+    post["_content_lc"] = content_lc
+    for index, unindexed, text in _search_indexes(post):
+        if len(text) > _INDEX_MAX_LEN:
+            unindexed.add(post["id"])
+            continue
+        for gram in _trigrams(text):
+            index.setdefault(gram, set()).add(post["id"])
+
+
+def _unindex_text(post):
+    """Remove the post from the search indexes."""
+    for index, unindexed, text in _search_indexes(post):
+        if len(text) > _INDEX_MAX_LEN:
+            unindexed.discard(post["id"])
+            continue
+        for gram in _trigrams(text):
+            ids = index.get(gram)
+            if ids is None:
+                continue
+            ids.discard(post["id"])
+            if not ids:
+                del index[gram]
+
+
+def _candidate_ids(query, index, unindexed):
+    """
+    Return the ids of posts that may contain query, or None if the query is
+    too short to narrow the search through the index. Posts whose text was
+    too long to index are always included. The caller must hold _LOCK.
+    """
+    if len(query) < 3:
+        return None
+    postings = [index.get(gram) for gram in _trigrams(query)]
+    if None in postings:
+        return set(unindexed)
+    return set.intersection(*postings) | unindexed
+
+
+def _search_columns():
+    """
+    Return the search columns, rebuilding them if the posts have changed.
+    The caller must hold _LOCK.
+    """
+    global _SEARCH_COLUMNS
+    if _SEARCH_COLUMNS is None:
+        posts = list(POSTS_BY_ID.values())
+        _SEARCH_COLUMNS = (
+            posts,
+            [post["_title_lc"] for post in posts],
+            [post["_content_lc"] for post in posts],
+        )
+    return _SEARCH_COLUMNS
+
+
+def _public(post):
+    """Return a copy of the post without internal ('_'-prefixed) keys."""
+    return {key: value for key, value in post.items() if not key.startswith("_")}
+
+
+for _post in POSTS_BY_ID.values():
+    _index_text(_post, _post["title"], _post["content"])
+
+
+@app.errorhandler(413)
+def request_too_large(error):
+    """Return a JSON error when the body exceeds MAX_CONTENT_LENGTH."""
+    return _json_response({"error": "Request body too large"}, 413)
 
-POSTS = [
-    {"id": 1, "title": "First post", "content": "This is the first post."},
-    {"id": 2, "title": "Second post", "content": "This is the second post."},
-]
 
 @app.route('/api/posts', methods=['GET'])
 def get_posts():
@@ -35,22 +248,39 @@ def get_posts():
     order = request.args.get("order", "asc") 
 
     # Validate the sort_by parameter
-    if sort_by not in [None, "id", "title", "content"]:
-        return jsonify({"error": "Invalid sort_by field. Must be 'id', 'title', or 'content'."}), 400
-
-    # Sort the posts if a valid sort_by field is provided
-    if sort_by:
-        reverse = (order == "desc")
-        try:
-            sorted_posts = sorted(POSTS, key=lambda post: post[sort_by], reverse=reverse)
-        except KeyError:
-            return jsonify({"error": f"Cannot sort by '{sort_by}'. Field does not exist."}), 400
-    else:
-        # If no sorting is specified, keep the original order
-        sorted_posts = POSTS
+    if sort_by not in _VALID_SORT_FIELDS:
+        return _json_response({
+            "error": "Invalid sort_by field. Must be 'id', 'title', or 'content'."
+        }, 400)
+
+    reverse = (order == "desc")
+    cache_key = (sort_by, reverse) if sort_by else None
+
+    # Reuse the serialized body while the posts are unchanged
+    body = _JSON_CACHE.get(cache_key)
+    if body is None:
+        # Take a snapshot so concurrent writes cannot change the posts mid-iteration
+        with _LOCK:
+            generation = _GENERATION
+            posts = list(POSTS_BY_ID.values())
+
+        # Sort the posts if a valid sort_by field is provided
+        if sort_by:
+            try:
+                sorted_posts = sorted(posts, key=operator.itemgetter(sort_by), reverse=reverse)
+            except KeyError:
+                return _json_response({
+                    "error": f"Cannot sort by '{sort_by}'. Field does not exist."
+                }, 400)
+        else:
+            # If no sorting is specified, keep the original order
+            sorted_posts = posts
+
+        body = _dumps([_public(post) for post in sorted_posts])
+        _cache_store(_JSON_CACHE, cache_key, body, generation)
 
     # Return the sorted or original list of posts as JSON
-    return jsonify(sorted_posts), 200
+    return _json_response(body, 200)
 
 
 @app.route('/api/posts', methods=['POST'])
@@ -69,30 +299,38 @@ def add_post():
     Returns:
         Response: A JSON response containing the new post with its assigned ID and a 201 
         status code if successful. If either 'title' or 'content' is missing, returns a 
-        400 error with details of the missing fields.
+        400 error with details of the missing fields. Also returns a 400 error if the
+        body is malformed JSON, not a JSON object, or 'title'/'content' are not strings,
+        a 413 error if the body exceeds MAX_CONTENT_LENGTH, and a 415 error if the
+        Content-Type is not application/json.
     """
 
     # Get JSON data from request body
-    data = request.get_json()  
+    data, error = _read_json_body()
+    if error is not None:
+        return error
     
     # Check if 'title' and 'content' are in the data
-    missing_fields = [field for field in ['title', 'content'] if field not in data]
-    if missing_fields:
-        return jsonify({
+    if "title" not in data or "content" not in data:
+        missing_fields = [field for field in _REQUIRED_POST_FIELDS if field not in data]
+        return _json_response({
             "error": "Missing required fields",
             "missing_fields": missing_fields
-        }), 400
+        }, 400)
+    if not isinstance(data["title"], str) or not isinstance(data["content"], str):
+        return _json_response({"error": "'title' and 'content' must be strings"}, 400)
 
-    # Generate a new id for the post
-    new_id = max(post["id"] for post in POSTS) + 1 if POSTS else 1
-    new_post = OrderedDict([
-        ("id", new_id),
-        ("title", data["title"]),
-        ("content", data["content"])
-    ])
+    global _NEXT_ID
+    with _LOCK:
+        # Generate a new id for the post
+        new_id = _NEXT_ID
+        _NEXT_ID += 1
+        new_post = {"id": new_id}
+        _index_text(new_post, data["title"], data["content"])
 
-    POSTS.append(new_post)
-    return jsonify(new_post), 201
+        POSTS_BY_ID[new_id] = new_post
+        _invalidate_caches()
+    return _json_response(_public(new_post), 201)
 
 
 # DELETE endpoint to delete a post by id
@@ -114,16 +352,18 @@ def delete_post(id):
         error with an appropriate message.
     """
 
-    # Find the post by id
-    post_to_delete = next((post for post in POSTS if post["id"] == id), None)
-    
+    with _LOCK:
+        # Find the post by id and remove it in a single lookup
+        post_to_delete = POSTS_BY_ID.pop(id, None)
+        if post_to_delete is not None:
+            _unindex_text(post_to_delete)
+            _invalidate_caches()
+
     # If post not found, return 404 error
     if post_to_delete is None:
-        return jsonify({"error": f"Post with id {id} not found"}), 404
+        return _json_response({"error": f"Post with id {id} not found"}, 404)
 
-    # If post is found, delete it
-    POSTS.remove(post_to_delete)
-    return jsonify({"message": f"Post with id {id} has been deleted successfully."}), 200
+    return _json_response({"message": f"Post with id {id} has been deleted successfully."}, 200)
 
 
 
@@ -139,36 +379,52 @@ def update_post(post_id):
     Path Parameters:
         post_id (int): The unique identifier of the post to update.
 
+    Request Body (JSON):
+        title (str, optional): The new title of the post.
+        content (str, optional): The new content of the post.
+
     Returns:
         Response: A JSON response containing the updated post and a 200 status code
         if successful. If the post is not found, returns a 404 error with an appropriate message.
+        Returns a 400 error if the body is malformed JSON, not a JSON object, or
+        'title'/'content' are not strings, a 413 error if the body exceeds
+        MAX_CONTENT_LENGTH, and a 415 error if the Content-Type is not application/json.
     """
-    # Find the post by post_id
-    post_to_update = next((post for post in POSTS if post["id"] == post_id), None)
-    
-    # If post not found, return 404 error
-    if post_to_update is None:
-        return jsonify({"error": f"Post with id {post_id} not found"}), 404
+    # If post not found, return 404 error before looking at the body
+    with _LOCK:
+        post_exists = post_id in POSTS_BY_ID
+    if not post_exists:
+        return _json_response({"error": f"Post with id {post_id} not found"}, 404)
 
     # Get JSON data from request body
-    data = request.get_json()
-    
-    # Update fields if provided, else keep current values
-    title = data.get("title", post_to_update["title"])
-    content = data.get("content", post_to_update["content"])
-    
-    # Update the post in place
-    post_to_update["title"] = title
-    post_to_update["content"] = content
-
-    # Return the updated post
-    updated_post = OrderedDict([
-        ("id", post_to_update["id"]),
-        ("title", post_to_update["title"]),
-        ("content", post_to_update["content"])
-    ])
+    data, error = _read_json_body()
+    if error is not None:
+        return error
+
+    with _LOCK:
+        # Find the post by post_id again, it may have been deleted meanwhile
+        post_to_update = POSTS_BY_ID.get(post_id)
+        if post_to_update is None:
+            return _json_response({"error": f"Post with id {post_id} not found"}, 404)
+
+        # Update fields if provided, else keep current values
+        title = data.get("title", post_to_update["title"])
+        content = data.get("content", post_to_update["content"])
+        if not isinstance(title, str) or not isinstance(content, str):
+            return _json_response({"error": "'title' and 'content' must be strings"}, 400)
+
+        # Update the post in place
+        _index_text(post_to_update, title, content)
+        _invalidate_caches()
+
+        # Return the updated post
+        updated_post = {
+            "id": post_to_update["id"],
+            "title": post_to_update["title"],
+            "content": post_to_update["content"]
+        }
     
-    return jsonify(updated_post), 200
+    return _json_response(updated_post, 200)
 
 
 @app.route('/api/posts/search', methods=['GET'])
@@ -192,17 +448,76 @@ def search_posts():
     title_query = request.args.get("title", "").lower()
     content_query = request.args.get("content", "").lower()
 
-    # Filter posts based on title and content queries
-    filtered_posts = [
-        post for post in POSTS
-        if (title_query in post["title"].lower() if title_query else True) and
-           (content_query in post["content"].lower() if content_query else True)
-    ]
+    # Serve repeated queries from the cache
+    key = (title_query, content_query)
+    with _LOCK:
+        filtered_posts = _SEARCH_CACHE.get(key)
+        if filtered_posts is not None:
+            _SEARCH_CACHE.move_to_end(key)
+    if filtered_posts is not None:
+        return _json_response(filtered_posts, 200)
+
+    with _LOCK:
+        generation = _GENERATION
+
+        # Narrow the search to posts sharing every trigram of the queries
+        title_ids = _candidate_ids(title_query, _TITLE_INDEX, _TITLE_UNINDEXED)
+        content_ids = _candidate_ids(content_query, _CONTENT_INDEX, _CONTENT_UNINDEXED)
+        if title_ids is None:
+            candidate_ids = content_ids
+        elif content_ids is None:
+            candidate_ids = title_ids
+        else:
+            candidate_ids = title_ids & content_ids
+
+        if candidate_ids is None:
+            columns = _search_columns()
+        else:
+            # Ids are assigned in creation order, so sorting keeps the usual order
+            candidates = [POSTS_BY_ID[post_id] for post_id in sorted(candidate_ids)]
+
+    # Filter posts based on title and content queries. An empty query is a
+    # substring of every string, so it matches all posts.
+    if candidate_ids is None:
+        posts, titles, contents = columns
+        filtered_posts = [
+            _public(post)
+            for post, title, content in zip(posts, titles, contents)
+            if title_query in title and content_query in content
+        ]
+    else:
+        filtered_posts = [
+            _public(post) for post in candidates
+            if title_query in post["_title_lc"] and content_query in post["_content_lc"]
+        ]
+
+    with _LOCK:
+        if generation == _GENERATION:
+            _SEARCH_CACHE[key] = filtered_posts
+            if len(_SEARCH_CACHE) > _SEARCH_CACHE_MAX:
+                _SEARCH_CACHE.popitem(last=False)
 
     # Return filtered posts
-    return jsonify(filtered_posts), 200
+    return _json_response(filtered_posts, 200)
 
 
 
 if __name__ == '__main__':
-    app.run(host="0.0.0.0", port=5002, debug=True)
+    # Use the threaded Werkzeug dev server (with debugger and reloader) only
+    # when asked to. In production, run under a WSGI server instead, e.g.
+    #   gunicorn -k gthread --workers 1 --threads 8 -b 0.0.0.0:5002 backend_app:app
+    # All posts, ids and caches live in this process's memory, so always use
+    # a single worker process and scale with threads.
+    if "--dev" in sys.argv:
+        app.run(host="0.0.0.0", port=5002, debug=True, threaded=True)
+    else:
+        try:
+            from waitress import serve
+        except ImportError:
+            app.logger.warning(
+                "waitress is not installed, falling back to the Werkzeug development "
+                "server. Install waitress or run under gunicorn for production use."
+            )
+            app.run(host="0.0.0.0", port=5002, threaded=True)
+        else:
+            serve(app, host="0.0.0.0", port=5002, threads=16)